@@ -0,0 +1,98 @@
+"""
+基于PyArrow的CSV快速写出
+
+输出与 DataFrame.to_csv() 逐字节一致：浮点数按numpy的最短表示格式化
+（与pandas相同，如 545700.0），时间按pandas规则输出（全为零点时只写日期），
+表头按csv模块的最小引号规则写出。遇到Arrow无法按相同格式写出的情况
+（需要加引号的字符串、含非str值的object列、非字符串分类、布尔列、
+亚秒精度时间、多层索引或索引名与列名冲突等）时回退到 to_csv()。
+"""
+
+import csv
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+# 按最小引号规则需要加引号的字符
+_NEEDS_QUOTING = '[",\r\n]'
+
+
+def write_csv(df, file_name, index=False):
+    """写出CSV，index=True 时与 to_csv() 一样把（单层）索引写为首列"""
+    if index:
+        index_name = '' if df.index.name is None else df.index.name
+        # 多层索引或索引名与列名冲突时无法展开为首列，交给pandas
+        if isinstance(df.index, pd.MultiIndex) or index_name in df.columns:
+            df.to_csv(file_name)
+            return
+        df = df.reset_index(names=index_name)
+    
+    # 单列数据中的空字符串需要加引号，直接交给pandas
+    columns = [_to_arrow(df.iloc[:, i]) for i in range(df.shape[1])] if df.shape[1] > 1 else [None]
+    if any(col is None for col in columns):
+        df.to_csv(file_name, index=False)
+        return
+    
+    table = pa.Table.from_arrays(columns, names=[str(c) for c in df.columns])
+    header = io.StringIO()
+    csv.writer(header, lineterminator=os.linesep).writerow(df.columns)
+    
+    with open(file_name, 'wb') as f:
+        f.write(header.getvalue().encode('utf-8'))
+        write_options = pacsv.WriteOptions(include_header=False, quoting_style='none')
+        if os.linesep == '\n':
+            pacsv.write_csv(table, f, write_options=write_options)
+        else:
+            # Arrow固定使用\n换行；数据中不含换行符，可直接替换为系统换行符
+            buffer = io.BytesIO()
+            pacsv.write_csv(table, buffer, write_options=write_options)
+            f.write(buffer.getvalue().replace(b'\n', os.linesep.encode()))
+
+
+def _to_arrow(series):
+    """把一列转换为文本形式与 to_csv() 一致的Arrow数组，无法保证时返回None"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # 仅处理字符串分类；数值分类含缺失值时无法还原原类型
+        if pd.api.types.infer_dtype(dtype.categories, skipna=True) != 'string':
+            return None
+        series = series.astype(object)
+        dtype = series.dtype
+    
+    if pd.api.types.is_bool_dtype(dtype):
+        return None
+    
+    if pd.api.types.is_integer_dtype(dtype):
+        return pa.array(series, from_pandas=True)
+    
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        values = series.to_numpy()
+        return pa.array(values.astype(str), mask=np.isnan(values))
+    
+    if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+        values = series.to_numpy()
+        valid = values[~np.isnat(values)]
+        if (valid != valid.astype('datetime64[s]')).any():
+            return None
+        if (valid == valid.astype('datetime64[D]')).all():
+            return pa.array(values.astype('datetime64[D]'), type=pa.date32(), from_pandas=True)
+        return pa.array(values.astype('datetime64[s]'), type=pa.timestamp('s'), from_pandas=True)
+    
+    if pd.api.types.is_string_dtype(dtype):
+        # object列中混有bytes等非str值时，to_csv按repr写出（如 b'x'）
+        if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+            return None
+        try:
+            arr = pa.array(series, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return None
+        if pc.any(pc.match_substring_regex(arr, _NEEDS_QUOTING)).as_py():
+            return None
+        return arr
+    
+    return None
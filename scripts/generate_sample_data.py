@@ -1,8 +1,12 @@
 import pandas as pd
 import numpy as np
+import numexpr as ne
 from datetime import datetime, timedelta
+import functools
 import os
 
+from arrow_csv import write_csv
+
 # Get the current date to append to the file name
 current_date = datetime.now().strftime("%Y%m%d")
 
@@ -15,64 +19,140 @@ parent_dir = os.path.join(current_dir, '..')
 # 构建到目标子文件夹的路径（例如：project_a/data/sample/）
 target_folder = os.path.join(parent_dir, 'data', 'sample')
     
-def generate_canadian_loan_data(n_loans=10000):
+def generate_canadian_loan_data(n_loans=10000, seed=42):
     """生成模拟的加拿大贷款数据"""
     
-    np.random.seed(42)
+    rng = np.random.default_rng(seed)
+    
+    # 贷款/客户编号（向量化拼接，使用Arrow字符串存储）
+    ids = np.char.zfill(np.arange(n_loans).astype(str), 8)
     
     # 贷款主数据
     loans = pd.DataFrame({
-        'loan_id': [f'L{str(i).zfill(8)}' for i in range(n_loans)],
-        'customer_id': [f'C{str(i).zfill(8)}' for i in range(n_loans)],
+        'loan_id': pd.array(np.char.add('L', ids), dtype='string[pyarrow]'),
+        'customer_id': pd.array(np.char.add('C', ids), dtype='string[pyarrow]'),
         'origination_date': pd.date_range(end='2024-01-01', periods=n_loans, freq='H'),
-        'product_type': np.random.choice(['Mortgage', 'HELOC', 'Auto', 'Credit Card'], n_loans, p=[0.4, 0.2, 0.3, 0.1]),
-        'province': np.random.choice(['ON', 'BC', 'QC', 'AB', 'MB', 'SK'], n_loans, p=[0.38, 0.13, 0.23, 0.11, 0.08, 0.07]),
-        'original_amount': np.random.lognormal(11, 1.5, n_loans),
-        'interest_rate': np.random.uniform(0.02, 0.08, n_loans),
-        'credit_score': np.random.normal(700, 80, n_loans).clip(300, 900).astype(int),
-        'annual_income': np.random.lognormal(10.8, 0.6, n_loans),
-        'loan_to_value': np.random.beta(5, 2, n_loans)
+        'product_type': rng.choice(['Mortgage', 'HELOC', 'Auto', 'Credit Card'], n_loans, p=[0.4, 0.2, 0.3, 0.1]),
+        'province': rng.choice(['ON', 'BC', 'QC', 'AB', 'MB', 'SK'], n_loans, p=[0.38, 0.13, 0.23, 0.11, 0.08, 0.07]),
+        'original_amount': rng.lognormal(11, 1.5, n_loans),
+        'interest_rate': rng.uniform(0.02, 0.08, n_loans),
+        'credit_score': rng.normal(700, 80, n_loans).clip(300, 900).astype(int),
+        'annual_income': rng.lognormal(10.8, 0.6, n_loans),
+        'loan_to_value': rng.beta(5, 2, n_loans)
     })
     
     # 调整mortgage的金额
     mortgage_mask = loans['product_type'] == 'Mortgage'
-    loans.loc[mortgage_mask, 'original_amount'] = np.random.lognormal(12.5, 0.8, mortgage_mask.sum())
+    loans.loc[mortgage_mask, 'original_amount'] = rng.lognormal(12.5, 0.8, mortgage_mask.sum())
     
     # 生成违约标记（与信用评分相关）
-    default_prob = 1 / (1 + np.exp((loans['credit_score'] - 650) / 50))
-    loans['default_flag'] = np.random.binomial(1, default_prob)
+    cs = loans['credit_score'].values
+    default_prob = ne.evaluate('1.0 / (1.0 + exp((cs - 650.0) / 50.0))')
+    loans['default_flag'] = rng.binomial(1, default_prob)
+    
+    # 压缩数值精度，产品类型和省份使用分类类型
+    loans = loans.astype({
+        'product_type': 'category',
+        'province': 'category',
+        'original_amount': 'float32',
+        'interest_rate': 'float32',
+        'credit_score': 'int16',
+        'annual_income': 'float32',
+        'loan_to_value': 'float32',
+        'default_flag': 'int8'
+    })
     
     return loans
 
 # 生成支付历史数据
-def generate_payment_history(loans_df):
-    """生成支付历史数据"""
-    payment_records = []
-    
-    for _, loan in loans_df.iterrows():
-        n_payments = np.random.randint(12, 36)
-        payment_dates = pd.date_range(
-            start=loan['origination_date'], 
-            periods=n_payments, 
-            freq='M'
-        )
-        
-        for payment_date in payment_dates:
-            dpd = 0
-            if loan['default_flag'] == 1 and np.random.random() < 0.3:
-                dpd = np.random.choice([0, 30, 60, 90], p=[0.4, 0.3, 0.2, 0.1])
-            
-            payment_records.append({
-                'loan_id': loan['loan_id'],
-                'payment_date': payment_date,
-                'scheduled_amount': loan['original_amount'] / 360,  # 简化计算
-                'days_past_due': dpd
-            })
-            
-    payment_history = pd.DataFrame(payment_records)
+def generate_payment_history(loans_df, seed=43, engine='numpy'):
+    """
+    生成支付历史数据
+    
+    Parameters:
+    engine (str): 计算引擎
+        - 'numpy': 全向量化（默认）
+        - 'numba': 逐笔贷款的JIT编译并行循环
+    """
+    rng = np.random.default_rng(seed)
+    n_loans = len(loans_df)
+    default_flag = loans_df['default_flag'].to_numpy()
+    
+    # 每笔贷款的还款期数
+    n_payments = rng.integers(12, 36, size=n_loans)
+    
+    # 逐期随机数一次性批量抽取：是否逾期、逾期天数
+    total = n_payments.sum()
+    delinquent_draw = rng.random(total)
+    dpd_draw = rng.choice(np.array([0, 30, 60, 90], dtype=np.int8), size=total, p=[0.4, 0.3, 0.2, 0.1])
+    
+    # 展开为逐期的贷款索引、期数偏移和逾期天数（两种引擎结果一致）
+    if engine == 'numpy':
+        loan_idx, month_offset, dpd = _expand_payments_numpy(n_payments, default_flag, delinquent_draw, dpd_draw)
+    elif engine == 'numba':
+        loan_idx, month_offset, dpd = _get_numba_kernel()(n_payments, default_flag, delinquent_draw, dpd_draw)
+    else:
+        raise ValueError(f"未知的计算引擎: {engine}")
+    
+    payment_history = pd.DataFrame({
+        'loan_id': loans_df['loan_id'].values[loan_idx],
+        'payment_date': _payment_dates(loans_df['origination_date'].values, loan_idx, month_offset),
+        'scheduled_amount': loans_df['original_amount'].values[loan_idx] / 360,  # 简化计算
+        'days_past_due': dpd
+    })
     
     return payment_history
 
+def _payment_dates(origination, loan_idx, month_offset):
+    """
+    还款日：从放款当月月末起逐月推移（与 pd.date_range(freq='M') 一致，保留时刻）
+    
+    放款月份和时刻按贷款计算一次，逐期只做datetime64[M]整数偏移。
+    """
+    orig_month = origination.astype('datetime64[M]')
+    time_of_day = origination - origination.astype('datetime64[D]')
+    month_end = (orig_month[loan_idx] + month_offset + 1).astype('datetime64[D]') - np.timedelta64(1, 'D')
+    return month_end + time_of_day[loan_idx]
+
+def _expand_payments_numpy(n_payments, default_flag, delinquent_draw, dpd_draw):
+    """全向量化展开逐期还款记录"""
+    total = n_payments.sum()
+    loan_idx = np.repeat(np.arange(len(n_payments)), n_payments)
+    month_offset = np.arange(total) - np.repeat(np.cumsum(n_payments) - n_payments, n_payments)
+    
+    # 逾期天数：违约贷款每期有30%概率出现逾期
+    delinquent = (default_flag[loan_idx] == 1) & (delinquent_draw < 0.3)
+    dpd = np.where(delinquent, dpd_draw, 0)
+    
+    return loan_idx, month_offset, dpd
+
+@functools.lru_cache(maxsize=None)
+def _get_numba_kernel():
+    """编译逐笔贷款展开还款记录的numba内核（仅在使用时导入numba）"""
+    import numba
+    
+    @numba.njit(parallel=True)
+    def expand_payments(n_payments, default_flag, delinquent_draw, dpd_draw):
+        n_loans = len(n_payments)
+        starts = np.cumsum(n_payments) - n_payments
+        total = n_payments.sum()
+        loan_idx = np.empty(total, dtype=np.int64)
+        month_offset = np.empty(total, dtype=np.int64)
+        dpd = np.zeros(total, dtype=dpd_draw.dtype)
+        
+        # 随机数已预先抽取，按全局期序号取用，并行结果可复现
+        for i in numba.prange(n_loans):
+            for k in range(n_payments[i]):
+                j = starts[i] + k
+                loan_idx[j] = i
+                month_offset[j] = k
+                if default_flag[i] == 1 and delinquent_draw[j] < 0.3:
+                    dpd[j] = dpd_draw[j]
+        
+        return loan_idx, month_offset, dpd
+    
+    return expand_payments
+
 # 主程序执行
 if __name__ == "__main__":
     # 生成贷款数据
@@ -80,7 +160,7 @@ if __name__ == "__main__":
     
     # 保存贷款数据
     loans_file_name = os.path.join(target_folder, f"loans_{current_date}.csv")
-    loans.to_csv(loans_file_name, index=False)
+    write_csv(loans, loans_file_name)
     print(f"贷款数据已保存为 {loans_file_name}")
     
     # 生成支付历史数据
@@ -88,5 +168,5 @@ if __name__ == "__main__":
     
     # 保存支付历史数据
     payment_history_name = os.path.join(target_folder, f"payment_history_{current_date}.csv")
-    payment_history.to_csv(payment_history_name, index=False)
+    write_csv(payment_history, payment_history_name)
     print(f"支付历史数据已保存为 {payment_history_name}")
\ No newline at end of file
@@ -6,15 +6,28 @@
 
 import pandas as pd
 import numpy as np
+import numexpr as ne
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 import os
+import glob
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+from arrow_csv import write_csv
+
 # Get the current date to append to the file name
 current_date = datetime.now().strftime("%Y%m%d")
 
+# 并行加载时保证每段输出完整不交错
+_print_lock = threading.Lock()
+
 class MacroDataProcessor:
     """宏观经济数据处理器"""
     
@@ -26,49 +39,47 @@ class MacroDataProcessor:
             self.data_path = os.path.join(parent_dir, 'data', 'sample', 'macro_data') + os.sep
         else:
             self.data_path = data_path
+        # 整合结果缓存目录（与宏观数据目录同级）
+        self.cache_path = os.path.join(os.path.dirname(os.path.normpath(self.data_path)), '.cache') + os.sep
         self.start_date = '2020-01-01'
         self.end_date = '2024-12-31'
         
     def load_cpi_data(self):
         """加载CPI数据"""
-        print("Loading CPI data...")
-        df = pd.read_csv(f'{self.data_path}CPI_Monthly-1810000401-eng.csv', 
-                        skiprows=9, encoding='utf-8')
-        
+        self._log("Loading CPI data...")
         # 提取All-items CPI
-        cpi_data = df[df['Products and product groups 3 4'] == 'All-items'].iloc[:, 1:].T
-        cpi_data.columns = ['CPI']
-        cpi_data.index = pd.to_datetime(cpi_data.index.str.strip(), format='%B %Y')
+        df = self._read_statcan_rows('CPI_Monthly-1810000401-eng.csv', 9,
+                                     'Products and product groups 3 4', ['All-items'])
+        date_cols = df.columns[1:]
+        cpi_data = pd.DataFrame(
+            {'CPI': pd.to_numeric(df[date_cols].to_numpy().ravel(), errors='coerce')},
+            index=pd.to_datetime(date_cols.str.strip(), format='%B %Y')
+        )
         cpi_data = cpi_data.loc[self.start_date:self.end_date]
         
         # 计算通胀率（年同比）
-        cpi_data['CPI'] = pd.to_numeric(cpi_data['CPI'], errors='coerce')
-        cpi_data['Inflation_YoY'] = cpi_data['CPI'].pct_change(12) * 100
+        cpi_data['Inflation_YoY'] = self._pct_change(cpi_data['CPI'], 12)
         
         return cpi_data
     
     def load_labour_force_data(self):
         """加载劳动力市场数据"""
-        print("Loading labour force data...")
-        df = pd.read_csv(f'{self.data_path}Labour_Force-1410028701-eng.csv', 
-                        skiprows=12, encoding='utf-8')
-        
-        # 提取失业率和就业率
-        labour_data = pd.DataFrame()
+        self._log("Loading labour force data...")
+        df = self._read_statcan_rows('Labour_Force-1410028701-eng.csv', 12,
+                                     'Labour force characteristics', ['Unemployment rate 16', 'Employment rate 18'])
         
-        # 找到失业率行
-        unemp_row = df[df['Labour force characteristics'] == 'Unemployment rate 16'].iloc[:, 6:]
-        emp_row = df[df['Labour force characteristics'] == 'Employment rate 18'].iloc[:, 6:]
+        # 一次取出失业率和就业率两行（第7列起为月度数据）
+        rows = df.set_index('Labour force characteristics').loc[['Unemployment rate 16', 'Employment rate 18']]
+        date_cols = df.columns[6:]
+        values = pd.to_numeric(rows[date_cols].to_numpy().ravel(), errors='coerce').reshape(2, -1)
         
         # 转换为时间序列
-        dates = pd.to_datetime([col.replace(' ', '-01-') for col in unemp_row.columns])
-        
-        labour_data['Unemployment_Rate'] = unemp_row.values.flatten()
-        labour_data['Employment_Rate'] = emp_row.values.flatten()
-        labour_data.index = dates
-        
+        labour_data = pd.DataFrame(
+            values.T,
+            index=pd.to_datetime(date_cols, format='%B %Y'),
+            columns=['Unemployment_Rate', 'Employment_Rate']
+        )
         labour_data = labour_data.loc[self.start_date:self.end_date]
-        labour_data = labour_data.apply(pd.to_numeric, errors='coerce')
         
         return labour_data
     
@@ -83,19 +94,18 @@ class MacroDataProcessor:
             - 'cubic': 三次样条插值
             - 'constant': 常数填充（年度值保持不变）
         """
-        print("Loading GDP data...")
-        df = pd.read_csv(f'{self.data_path}GDP-3610040201-eng.csv', 
-                        skiprows=10, encoding='utf-8')
-        
+        self._log("Loading GDP data...")
         # 提取加拿大总GDP（安大略省也可选）
-        gdp_data = df[df['Geography'] == 'Ontario'][['2020', '2021', '2022', '2023', '2024']].T
+        years = ['2020', '2021', '2022', '2023', '2024']
+        df = self._read_statcan_rows('GDP-3610040201-eng.csv', 10,
+                                     'Geography', ['Ontario'], include_columns=['Geography'] + years)
+        gdp_data = df[years].T
         gdp_data.columns = ['GDP_Ontario']
         gdp_data.index = pd.to_datetime(gdp_data.index.astype(str) + '-01-01')
         
         # 将GDP数据转换为数值类型（移除逗号并转换为float）
         gdp_data['GDP_Ontario'] = gdp_data['GDP_Ontario'].astype(str).str.replace(',', '').astype(float)
-        print("原始年度GDP数据:")
-        print(gdp_data)
+        self._log("原始年度GDP数据:", gdp_data)
         
         # 创建完整的月度时间范围
         start_date = pd.to_datetime(self.start_date)
@@ -107,129 +117,111 @@ class MacroDataProcessor:
             # 方法1：前向填充（推荐）
             # 将年度数据重新索引到月度，然后前向填充
             gdp_monthly = gdp_data.reindex(monthly_index, method='ffill')
-            print("使用前向填充方法")
+            self._log("使用前向填充方法")
             
         elif method == 'linear':
             # 方法2：线性插值
             # 使用numpy的线性插值
             gdp_values = gdp_data['GDP_Ontario'].values
-            gdp_dates = gdp_data.index.astype(np.int64) // 10**9  # 转换为秒
-            monthly_dates = monthly_index.astype(np.int64) // 10**9
+            gdp_dates = gdp_data.index.asi8  # 纳秒时间戳，无需额外转换
+            monthly_dates = monthly_index.asi8
             
             # 使用numpy插值
             interpolated_values = np.interp(monthly_dates, gdp_dates, gdp_values)
             gdp_monthly = pd.DataFrame({'GDP_Ontario': interpolated_values}, index=monthly_index)
-            print("使用线性插值方法")
+            self._log("使用线性插值方法")
             
         elif method == 'cubic':
             # 方法3：三次样条插值
             from scipy import interpolate
             
             gdp_values = gdp_data['GDP_Ontario'].values
-            gdp_dates = gdp_data.index.astype(np.int64) // 10**9  # 转换为秒
-            monthly_dates = monthly_index.astype(np.int64) // 10**9
+            gdp_dates = gdp_data.index.asi8  # 纳秒时间戳，无需额外转换
+            monthly_dates = monthly_index.asi8
             
             # 使用scipy三次样条插值
             f = interpolate.interp1d(gdp_dates, gdp_values, kind='cubic', 
                                    bounds_error=False, fill_value='extrapolate')
             interpolated_values = f(monthly_dates)
             gdp_monthly = pd.DataFrame({'GDP_Ontario': interpolated_values}, index=monthly_index)
-            print("使用三次样条插值方法")
+            self._log("使用三次样条插值方法")
             
         elif method == 'constant':
             # 方法4：常数填充（年度值保持不变）
             gdp_monthly = gdp_data.reindex(monthly_index, method='ffill')
-            print("使用常数填充方法")
+            self._log("使用常数填充方法")
             
         else:
             raise ValueError(f"未知的插值方法: {method}")
         
         # 计算GDP增长率（年同比）
-        gdp_monthly['GDP_Growth_YoY'] = gdp_monthly['GDP_Ontario'].pct_change(12) * 100
+        gdp_monthly['GDP_Growth_YoY'] = self._pct_change(gdp_monthly['GDP_Ontario'], 12)
         
-        print("处理后的月度GDP数据（前10行）:")
-        print(gdp_monthly.head(10))
-        print("处理后的月度GDP数据（后10行）:")
-        print(gdp_monthly.tail(10))
+        self._log("处理后的月度GDP数据（前10行）:", gdp_monthly.head(10),
+                  "处理后的月度GDP数据（后10行）:", gdp_monthly.tail(10))
         
         return gdp_monthly
     
     def load_interest_rates(self):
         """加载利率数据"""
-        print("Loading interest rate data...")
-        
-        # 政策利率（日度）
-        policy_df = pd.read_csv(f'{self.data_path}Policy_Interest_Rate-V39079-sd-2020-01-01-ed-2024-12-31.csv', 
-                               skiprows=8)
-        policy_df['date'] = pd.to_datetime(policy_df['date'])
-        policy_df = policy_df.set_index('date')
-        policy_monthly = policy_df.resample('M').mean()
-        policy_monthly.columns = ['Policy_Rate']
-        
-        # 基准利率（周度）
-        prime_df = pd.read_csv(f'{self.data_path}Prime_Rate-V80691311-sd-2020-01-01-ed-2024-12-31.csv', 
-                              skiprows=8)
-        prime_df['date'] = pd.to_datetime(prime_df['date'])
-        prime_df = prime_df.set_index('date')
-        prime_monthly = prime_df.resample('M').mean()
-        prime_monthly.columns = ['Prime_Rate']
-        
-        # 5年期抵押贷款利率（周度）
-        mortgage_df = pd.read_csv(f'{self.data_path}5Year_Conventional_Mortgage-V80691335-sd-2020-01-01-ed-2024-12-31.csv', 
-                                 skiprows=8)
-        mortgage_df['date'] = pd.to_datetime(mortgage_df['date'])
-        mortgage_df = mortgage_df.set_index('date')
-        mortgage_monthly = mortgage_df.resample('M').mean()
-        mortgage_monthly.columns = ['Mortgage_5Y_Rate']
-        
-        # 合并利率数据
-        rates_data = pd.concat([policy_monthly, prime_monthly, mortgage_monthly], axis=1)
+        self._log("Loading interest rate data...")
+        
+        # 政策利率（日度）、基准利率（周度）、5年期抵押贷款利率（周度）按日期外连接
+        rates_data = pd.concat([
+            self._read_boc_series('Policy_Interest_Rate-V39079-sd-2020-01-01-ed-2024-12-31.csv', 'Policy_Rate'),
+            self._read_boc_series('Prime_Rate-V80691311-sd-2020-01-01-ed-2024-12-31.csv', 'Prime_Rate'),
+            self._read_boc_series('5Year_Conventional_Mortgage-V80691335-sd-2020-01-01-ed-2024-12-31.csv', 'Mortgage_5Y_Rate')
+        ], axis=1)
+        
+        # 一次性转为月度（取月均值）
+        rates_data = rates_data.resample('M').mean()
         
         # 计算利差
-        rates_data['Prime_Policy_Spread'] = rates_data['Prime_Rate'] - rates_data['Policy_Rate']
-        rates_data['Mortgage_Prime_Spread'] = rates_data['Mortgage_5Y_Rate'] - rates_data['Prime_Rate']
+        rates_data.eval(
+            'Prime_Policy_Spread = Prime_Rate - Policy_Rate\n'
+            'Mortgage_Prime_Spread = Mortgage_5Y_Rate - Prime_Rate',
+            inplace=True
+        )
         
         return rates_data.loc[self.start_date:self.end_date]
     
     def load_fx_data(self):
         """加载汇率数据"""
-        print("Loading FX data...")
-        df = pd.read_csv(f'{self.data_path}FX_USD_CAD-sd-2020-01-01-ed-2024-12-31.csv', 
-                        skiprows=8)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.set_index('date')
+        self._log("Loading FX data...")
+        fx_daily = self._read_boc_series('FX_USD_CAD-sd-2020-01-01-ed-2024-12-31.csv', 'USD_CAD')
         
         # 日度转月度（取月均值）
-        fx_monthly = df.resample('M').mean()
-        fx_monthly.columns = ['USD_CAD']
+        fx_monthly = fx_daily.resample('M').mean().to_frame()
         
         # 计算汇率变化率
-        fx_monthly['FX_Change_MoM'] = fx_monthly['USD_CAD'].pct_change() * 100
-        fx_monthly['FX_Change_YoY'] = fx_monthly['USD_CAD'].pct_change(12) * 100
+        fx_monthly['FX_Change_MoM'] = self._pct_change(fx_monthly['USD_CAD'], 1)
+        fx_monthly['FX_Change_YoY'] = self._pct_change(fx_monthly['USD_CAD'], 12)
         
         return fx_monthly.loc[self.start_date:self.end_date]
     
     def load_housing_data(self):
         """加载房价指数数据"""
-        print("Loading housing price index data...")
+        self._log("Loading housing price index data...")
         df = pd.read_csv(f'{self.data_path}MLS_HPI_data_August_2025.csv', 
-                        skiprows=0)
+                        usecols=['Date', 'Aggregate Composite MLS® HPI*'], engine='pyarrow')
         
         # 处理日期和价格
         df['Date'] = pd.to_datetime(df['Date'])
-        df['HPI'] = df['Aggregate Composite MLS® HPI*'].str.replace('$', '').str.replace(',', '').astype(float)
+        # 一次性去除货币符号和千分位逗号
+        df['HPI'] = df['Aggregate Composite MLS® HPI*'].str.translate({ord('$'): None, ord(','): None}).astype(float)
         df = df[['Date', 'HPI']].set_index('Date')
         
         # 计算房价增长率
-        df['HPI_Change_MoM'] = df['HPI'].pct_change() * 100
-        df['HPI_Change_YoY'] = df['HPI'].pct_change(12) * 100
+        df['HPI_Change_MoM'] = self._pct_change(df['HPI'], 1)
+        df['HPI_Change_YoY'] = self._pct_change(df['HPI'], 12)
         
         return df.loc[self.start_date:self.end_date]
     
     def load_oil_prices(self):
         """加载油价数据"""
-        print("Loading oil price data...")
-        df = pd.read_csv(f'{self.data_path}WCS_Oil_Prices_Alberta_1757748101538.csv')
+        self._log("Loading oil price data...")
+        df = pd.read_csv(f'{self.data_path}WCS_Oil_Prices_Alberta_1757748101538.csv', 
+                        usecols=['Date', 'Type', 'Value'], dtype={'Value': 'float64'}, engine='pyarrow')
         
         # 处理日期
         df['Date'] = pd.to_datetime(df['Date'])
@@ -244,71 +236,131 @@ class MacroDataProcessor:
         
         # 计算价差和变化率
         oil_data['WCS_WTI_Spread'] = oil_data['WCS_Price'] - oil_data['WTI_Price']
-        oil_data['WTI_Change_YoY'] = oil_data['WTI_Price'].pct_change(12) * 100
+        oil_data['WTI_Change_YoY'] = self._pct_change(oil_data['WTI_Price'], 12)
         
         return oil_data.loc[self.start_date:self.end_date]
     
+    @staticmethod
+    def _pct_change(values, periods):
+        """按行位移计算变化率（%），等价于 pct_change(periods) * 100"""
+        if periods < 1:
+            raise ValueError(f"位移期数必须不小于1: {periods}")
+        current = np.asarray(values, dtype=np.float64)
+        previous = np.full_like(current, np.nan)
+        previous[periods:] = current[:-periods]
+        return ne.evaluate('(current / previous - 1.0) * 100.0')
+    
+    def _read_statcan_rows(self, file_name, skip_rows, key_col, keys, include_columns=None):
+        """读取统计局宽表CSV，在Arrow表上筛选所需行后再转为pandas"""
+        table = pacsv.read_csv(
+            f'{self.data_path}{file_name}',
+            read_options=pacsv.ReadOptions(skip_rows=skip_rows),
+            # 单位行和表尾脚注的列数与表头不一致，直接跳过
+            parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+            convert_options=pacsv.ConvertOptions(include_columns=include_columns or [])
+        )
+        table = table.filter(pc.is_in(table[key_col], value_set=pa.array(keys)))
+        
+        # 列数不符的行会被跳过，需确认每个目标行都恰好读到一次
+        counts = pd.Series(table[key_col].to_pylist()).value_counts()
+        for key in keys:
+            if counts.get(key, 0) != 1:
+                raise ValueError(f"{file_name} 中 '{key_col}' = '{key}' 的行应恰好出现一次，实际 {counts.get(key, 0)} 次")
+        
+        return table.to_pandas()
+    
+    def _read_boc_series(self, file_name, name):
+        """读取加拿大央行单序列CSV，返回以日期为索引的数值序列"""
+        # 跳过元数据和表头行，直接指定列名和类型，由Arrow一次完成解析
+        df = pd.read_csv(f'{self.data_path}{file_name}', skiprows=9, header=None,
+                         names=['date', name], dtype={name: 'float64'}, engine='pyarrow')
+        return pd.Series(df[name].values, index=pd.to_datetime(df['date']), name=name)
+    
     def create_stress_scenarios(self, macro_data):
         """创建压力测试场景"""
         print("Creating stress testing scenarios...")
         
         # 基准场景：使用最近12个月的平均值
         baseline = macro_data.tail(12).mean()
-        
-        # 不利场景（Adverse）
-        adverse = baseline.copy()
-        adverse['Unemployment_Rate'] = baseline['Unemployment_Rate'] + 3.0  # 失业率上升3%
-        adverse['GDP_Growth_YoY'] = baseline['GDP_Growth_YoY'] - 3.0  # GDP增长下降3%
-        adverse['HPI_Change_YoY'] = -10.0  # 房价下跌10%
-        adverse['Policy_Rate'] = baseline['Policy_Rate'] + 2.0  # 利率上升200bp
-        
-        # 严重不利场景（Severely Adverse）
-        severe = baseline.copy()
-        severe['Unemployment_Rate'] = baseline['Unemployment_Rate'] + 5.0  # 失业率上升5%
-        severe['GDP_Growth_YoY'] = -5.0  # GDP负增长5%
-        severe['HPI_Change_YoY'] = -20.0  # 房价下跌20%
-        severe['Policy_Rate'] = baseline['Policy_Rate'] + 3.0  # 利率上升300bp
-        severe['WTI_Price'] = 40.0  # 油价跌至$40
-        
-        scenarios = pd.DataFrame({
-            'Baseline': baseline,
-            'Adverse': adverse,
-            'Severely_Adverse': severe
-        }).T
+        scenario_names = ['Baseline', 'Adverse', 'Severely_Adverse']
+        
+        # 各场景相对基准的冲击增量
+        shocks = {
+            'Adverse': {
+                'Unemployment_Rate': 3.0,  # 失业率上升3%
+                'GDP_Growth_YoY': -3.0,    # GDP增长下降3%
+                'Policy_Rate': 2.0         # 利率上升200bp
+            },
+            'Severely_Adverse': {
+                'Unemployment_Rate': 5.0,  # 失业率上升5%
+                'Policy_Rate': 3.0         # 利率上升300bp
+            }
+        }
+        
+        # 各场景直接设定的绝对水平
+        levels = {
+            'Adverse': {
+                'HPI_Change_YoY': -10.0    # 房价下跌10%
+            },
+            'Severely_Adverse': {
+                'GDP_Growth_YoY': -5.0,    # GDP负增长5%
+                'HPI_Change_YoY': -20.0,   # 房价下跌20%
+                'WTI_Price': 40.0          # 油价跌至$40
+            }
+        }
+        
+        # 构建 (场景数, 变量数) 的增量矩阵和绝对值矩阵，一次广播得到所有场景
+        deltas = np.zeros((len(scenario_names), len(baseline)))
+        absolute = np.full((len(scenario_names), len(baseline)), np.nan)
+        for i, name in enumerate(scenario_names):
+            for col, value in shocks.get(name, {}).items():
+                deltas[i, baseline.index.get_loc(col)] = value
+            for col, value in levels.get(name, {}).items():
+                absolute[i, baseline.index.get_loc(col)] = value
+        
+        values = np.where(np.isnan(absolute), baseline.to_numpy()[None, :] + deltas, absolute)
+        scenarios = pd.DataFrame(values, index=scenario_names, columns=baseline.index)
         
         return scenarios
     
-    def consolidate_all_data(self):
-        """整合所有数据"""
+    def consolidate_all_data(self, use_cache=True):
+        """
+        整合所有数据
+        
+        Parameters:
+        use_cache (bool): 输入文件和本脚本均未修改时，跳过各加载函数，
+            直接读取上次整合结果的parquet缓存；传入False强制重新加载
+        """
         print("\n" + "="*50)
         print("Starting macro data consolidation...")
         print("="*50 + "\n")
         
-        # 加载各数据集
-        cpi_data = self.load_cpi_data()
-        labour_data = self.load_labour_force_data()
-        gdp_data = self.load_gdp_data()
-        rates_data = self.load_interest_rates()
-        fx_data = self.load_fx_data()
-        housing_data = self.load_housing_data()
-        oil_data = self.load_oil_prices()
-        
-        # 合并所有数据
-        macro_data = pd.concat([
-            cpi_data,
-            labour_data,
-            gdp_data,
-            rates_data,
-            fx_data,
-            housing_data,
-            oil_data
-        ], axis=1)
-        
-        # 处理缺失值（前向填充）
-        macro_data = macro_data.fillna(method='ffill')
-        
-        # 添加额外的风险指标
-        self._add_risk_indicators(macro_data)
+        macro_data = self._read_cache() if use_cache else None
+        if macro_data is None:
+            # 各数据集相互独立，并行加载后按固定顺序合并
+            loaders = [
+                self.load_cpi_data,
+                self.load_labour_force_data,
+                self.load_gdp_data,
+                self.load_interest_rates,
+                self.load_fx_data,
+                self.load_housing_data,
+                self.load_oil_prices
+            ]
+            with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+                results = list(executor.map(lambda loader: loader(), loaders))
+            
+            # 合并所有数据
+            macro_data = pd.concat(results, axis=1)
+            
+            # 处理缺失值（前向填充）
+            macro_data = macro_data.ffill()
+            
+            # 添加额外的风险指标
+            self._add_risk_indicators(macro_data)
+            
+            if use_cache:
+                self._write_cache(macro_data)
         
         # 创建压力测试场景
         scenarios = self.create_stress_scenarios(macro_data)
@@ -321,27 +373,70 @@ class MacroDataProcessor:
         
         return macro_data, scenarios
     
+    def _log(self, *lines):
+        """加锁逐行输出，避免并行加载时的输出交错"""
+        with _print_lock:
+            for line in lines:
+                print(line)
+    
+    def _cache_key(self):
+        """根据输入文件的修改时间、日期区间和本脚本代码生成缓存键"""
+        input_files = sorted(glob.glob(f'{self.data_path}*.csv'))
+        key = ':'.join(f'{f}:{os.path.getmtime(f)}' for f in input_files)
+        key += f':{self.start_date}:{self.end_date}'
+        
+        # 加载逻辑修改后缓存随之失效
+        with open(os.path.abspath(__file__), 'rb') as f:
+            key += ':' + hashlib.blake2b(f.read()).hexdigest()
+        
+        return hashlib.blake2b(key.encode()).hexdigest()
+    
+    def _read_cache(self):
+        """输入文件未变化时读取整合结果缓存，否则返回None"""
+        cache_file = f'{self.cache_path}macro_consolidated.parquet'
+        key_file = f'{self.cache_path}macro_consolidated.key'
+        if not (os.path.exists(cache_file) and os.path.exists(key_file)):
+            return None
+        
+        with open(key_file) as f:
+            if f.read() != self._cache_key():
+                return None
+        
+        print(f"Loading cached macro data from: {cache_file}")
+        print("(data loaders skipped; pass use_cache=False to force a reload)")
+        return pd.read_parquet(cache_file)
+    
+    def _write_cache(self, macro_data):
+        """保存整合结果缓存及其缓存键"""
+        os.makedirs(self.cache_path, exist_ok=True)
+        macro_data.to_parquet(f'{self.cache_path}macro_consolidated.parquet', engine='pyarrow', compression='zstd')
+        with open(f'{self.cache_path}macro_consolidated.key', 'w') as f:
+            f.write(self._cache_key())
+    
     def _add_risk_indicators(self, df):
         """添加风险指标"""
-        # 经济周期指标（基于失业率和GDP增长）
-        df['Economic_Cycle_Score'] = (
-            (df['Unemployment_Rate'] - df['Unemployment_Rate'].mean()) / df['Unemployment_Rate'].std() * (-1) +
-            (df['GDP_Growth_YoY'] - df['GDP_Growth_YoY'].mean()) / df['GDP_Growth_YoY'].std()
-        ) / 2
-        
-        # 信贷条件指标
-        df['Credit_Conditions'] = (
-            df['Prime_Rate'] * 0.4 + 
-            df['Mortgage_5Y_Rate'] * 0.4 + 
-            df['Prime_Policy_Spread'] * 0.2
-        )
-        
-        # 房地产风险指标
-        df['Housing_Risk_Score'] = (
-            df['HPI_Change_YoY'] * (-0.5) +  # 房价下跌增加风险
-            df['Mortgage_5Y_Rate'] * 0.3 +   # 高利率增加风险
-            df['Unemployment_Rate'] * 0.2    # 高失业率增加风险
-        )
+        # 一次性取出所需列，所有指标在同一数据块上计算
+        arr = df[['Unemployment_Rate', 'GDP_Growth_YoY', 'Prime_Rate',
+                  'Mortgage_5Y_Rate', 'Prime_Policy_Spread', 'HPI_Change_YoY']].to_numpy(dtype=np.float64)
+        unemp, gdp, prime, mortgage, spread, hpi = arr.T
+        unemp_mean, gdp_mean = np.nanmean(arr[:, :2], axis=0)
+        unemp_std, gdp_std = np.nanstd(arr[:, :2], axis=0, ddof=1)
+        
+        indicators = pd.DataFrame({
+            # 经济周期指标（基于失业率和GDP增长）
+            'Economic_Cycle_Score': ne.evaluate(
+                '((unemp - unemp_mean) / unemp_std * (-1) + (gdp - gdp_mean) / gdp_std) / 2'
+            ),
+            # 信贷条件指标
+            'Credit_Conditions': ne.evaluate(
+                'prime * 0.4 + mortgage * 0.4 + spread * 0.2'
+            ),
+            # 房地产风险指标：房价下跌、高利率、高失业率均增加风险
+            'Housing_Risk_Score': ne.evaluate(
+                'hpi * (-0.5) + mortgage * 0.3 + unemp * 0.2'
+            )
+        }, index=df.index)
+        df[indicators.columns] = indicators
         
         return df
     
@@ -354,8 +449,8 @@ class MacroDataProcessor:
         """保存处理后的数据"""
         print("Saving processed data...")
         
-        # 保存主数据集
-        macro_data.to_csv(f'{output_path}macro_data_{current_date}.csv')
+        # 保存主数据集（数值列较多，使用PyArrow写出）
+        write_csv(macro_data, f'{output_path}macro_data_{current_date}.csv', index=True)
         print(f"Main dataset saved to: {output_path}macro_data_{current_date}.csv")
         
         # 保存压力测试场景